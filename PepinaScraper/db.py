@@ -1,28 +1,95 @@
-import re
-import requests
-import os
-from bs4 import BeautifulSoup
 import sqlite3
 import logging
-from PyQt6 import QtWidgets as qtw
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QDoubleValidator
 
 #Създава и управлява SQLite база данни -- > products.db
-#Създаваме клас Db и ProductScraper, DataTable, MainWindow
-#Графичен интерфейс с PyQt6 -- > DataTable, MainWindow
+#Единственото място, което познава схемата на таблицата `products`.
+#Схемата е версионирана чрез PRAGMA user_version; при отваряне на по-стара база
+#миграциите се изпълняват автоматично.
 
 
-# Настройки за логване - позволява прихващане на грешки 
+# Настройки за логване - позволява прихващане на грешки
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Колоните на продукта в реда, в който се записват (без `id`)
+PRODUCT_COLUMNS = ('title', 'brand', 'price', 'color', 'sizes', 'link')
+
+
+def _format_sizes(sizes):
+    """Преобразува списък с размери в текст за колоната `sizes`."""
+    if sizes is None:
+        return ''
+    if isinstance(sizes, str):
+        return sizes
+    return ', '.join(str(size) for size in sizes)
+
+
+def _format_size(size):
+    """Размер във вида, в който се пази в `sizes`: 39.0 -> "39", 38.5 -> "38.5"."""
+    if isinstance(size, (int, float)):
+        return f"{size:g}"
+    return str(size).strip()
+
+
+def _like_escape(text):
+    """Екранира специалните символи на LIKE (с ESCAPE '\\')."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _migrate_to_v1(cursor):
+    """Каноничната схема на `products`.
+
+    Прехвърля данните от двете стари схеми (`title/brand/price/sizes/link`
+    от scraper.py и `brand/price/color/size` от db.py), ако има такава таблица.
+    `link` е уникален, за да не се дублират продуктите при повторен скрейп.
+    """
+    # Остатък от прекъсната миграция на стара версия на програмата
+    cursor.execute("DROP TABLE IF EXISTS products_v1")
+    cursor.execute('''
+        CREATE TABLE products_v1 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            brand TEXT,
+            price REAL,
+            color TEXT,
+            sizes TEXT,
+            link TEXT UNIQUE
+        )
+    ''')
+
+    cursor.execute("PRAGMA table_info(products)")
+    old_columns = {row[1] for row in cursor.fetchall()}
+    if old_columns:
+        copied = [column for column in ('id',) + PRODUCT_COLUMNS if column in old_columns]
+        targets = list(copied)
+        sources = list(copied)
+        if 'size' in old_columns and 'sizes' not in old_columns:
+            # Старата колона `size` е REAL (0.0 за липсващ размер) -> "38", "38.5"
+            targets.append('sizes')
+            sources.append("CASE WHEN size IS NULL OR size = 0 THEN '' "
+                           "ELSE rtrim(rtrim(CAST(size AS TEXT), '0'), '.') END")
+        # При повтарящ се `link` се запазва последният ред
+        cursor.execute(f"INSERT OR REPLACE INTO products_v1 ({', '.join(targets)}) "
+                       f"SELECT {', '.join(sources)} FROM products")
+        cursor.execute("DROP TABLE products")
+
+    cursor.execute("ALTER TABLE products_v1 RENAME TO products")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_price ON products (price)")
+
+
+# Миграциите се изпълняват последователно; версията на схемата е len(MIGRATIONS)
+MIGRATIONS = [
+    _migrate_to_v1,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
 # Клас за управление на базата данни
 class DB:
     def __init__(self, db_path='products.db'):
         self.db_path = db_path
         self.conn = None
         self.connect()
-        self.create_table()
+        self.migrate()
 
     def connect(self):
         """Свързване с базата данни SQLite."""
@@ -32,52 +99,100 @@ class DB:
         except sqlite3.Error as e:
             logging.error(f"Неуспешно свързване с базата данни: {e}")
 
-    def create_table(self):
-        """Създаване на таблица `products`, ако не съществува."""
-        if self.conn:
+    def schema_version(self):
+        """Текущата версия на схемата в базата данни."""
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self):
+        """Довежда схемата до SCHEMA_VERSION, като изпълнява липсващите миграции."""
+        if not self.conn:
+            return
+        version = self.schema_version()
+        if version > SCHEMA_VERSION:
+            logging.error(f"Базата данни е с версия {version}, по-нова от поддържаната {SCHEMA_VERSION}.")
+            return
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            # Изрична транзакция: sqlite3 не отваря такава преди CREATE/DROP/ALTER,
+            # а миграцията трябва да се приложи изцяло или никак.
+            cursor = self.conn.cursor()
             try:
-                cursor = self.conn.cursor()
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS products (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        brand TEXT,
-                        price REAL,
-                        color TEXT,
-                        size REAL
-                    )
-                ''')
-                self.conn.commit()
+                cursor.execute("BEGIN")
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {number}")
+                cursor.execute("COMMIT")
+                logging.info(f"Схемата е мигрирана до версия {number}.")
             except sqlite3.Error as e:
-                logging.error(f"Грешка при създаването на таблицата: {e}")
+                if self.conn.in_transaction:
+                    cursor.execute("ROLLBACK")
+                logging.error(f"Грешка при миграция до версия {number}: {e}")
+                return
 
-    def insert_row(self, product):
-        """Добавяне на данни за продукт в базата данни."""
+    def insert_rows(self, products):
+        """Добавяне на списък от продукти с една транзакция.
+
+        Продукт със съществуващ `link` се обновява вместо да се добави отново.
+        """
         if self.conn:
+            rows = [
+                tuple(_format_sizes(product.get(column)) if column == 'sizes' else product.get(column)
+                      for column in PRODUCT_COLUMNS)
+                for product in products
+            ]
+            placeholders = ', '.join('?' for _ in PRODUCT_COLUMNS)
+            updates = ', '.join(f"{column} = excluded.{column}" for column in PRODUCT_COLUMNS if column != 'link')
             try:
-                cursor = self.conn.cursor()
-                cursor.execute("INSERT INTO products (brand, price, color, size) VALUES (?, ?, ?, ?)",
-                               (product['brand'], product['price'], product['color'], product['size']))
-                self.conn.commit()
-                logging.info(f"Добавен продукт: {product}")
+                with self.conn:
+                    self.conn.executemany(
+                        f"INSERT INTO products ({', '.join(PRODUCT_COLUMNS)}) VALUES ({placeholders}) "
+                        f"ON CONFLICT(link) DO UPDATE SET {updates}",
+                        rows)
+                logging.info(f"Добавени продукти: {len(rows)}")
             except sqlite3.Error as e:
-                logging.error(f"Грешка при добавяне на продукт: {e}")
+                logging.error(f"Грешка при добавяне на продукти: {e}")
+
+    def insert_row(self, product):
+        """Добавяне на данни за продукт в базата данни."""
+        self.insert_rows([product])
+
+    def select_products(self, columns=PRODUCT_COLUMNS, order_by='id', descending=False,
+                        size=None, max_price=None):
+        """Извличане само на поисканите колони, с незадължителни филтри.
+
+        :param columns: колоните, които да се върнат (от PRODUCT_COLUMNS или `id`)
+        :param order_by: колона за сортиране
+        :param size: връща само продуктите, в чиито размери присъства `size` (число или текст)
+        :param max_price: връща само продуктите с цена <= `max_price`
+        """
+        allowed = ('id',) + PRODUCT_COLUMNS
+        for column in tuple(columns) + (order_by,):
+            if column not in allowed:
+                raise ValueError(f"Непозната колона: {column}")
+        if not self.conn:
+            return []
+
+        conditions = []
+        params = []
+        if size is not None:
+            # `sizes` е текст от вида "36, 37, 38"
+            conditions.append("(', ' || sizes || ', ') LIKE ? ESCAPE '\\'")
+            params.append(f"%, {_like_escape(_format_size(size))}, %")
+        if max_price is not None:
+            conditions.append("price <= ?")
+            params.append(max_price)
+
+        query = f"SELECT {', '.join(columns)} FROM products"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+        return self.conn.execute(query, params).fetchall()
 
     def select_all_data(self, order_by='id'):
         """Извличане на всички данни от таблицата `products`."""
-        if self.conn:
-            cursor = self.conn.cursor()
-            query = f"SELECT * FROM products ORDER BY {order_by}"
-            cursor.execute(query)
-            return cursor.fetchall()
-        return []
+        return self.select_products(order_by=order_by)
 
     def select_data_by_size(self, size):
         """Извличане на данни по размер на обувките."""
-        if self.conn:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT * FROM products WHERE size = ?", (size,))
-            return cursor.fetchall()
-        return []
+        return self.select_products(size=size)
 
     def close(self):
         """Затваряне на връзката към базата данни."""
@@ -85,122 +200,3 @@ class DB:
             self.conn.close()
             self.conn = None
             logging.info("Връзката с базата данни е затворена.")
-
-# Клас за уеб скрейпинг на сайта Pepina
-class ProductScraper:
-    def __init__(self, base_url):
-        self.base_url = base_url
-        self.products = []
-        self.output_dir = './data'
-        self.filename = 'obuvki.html'
-        self.file_path = os.path.join(self.output_dir, self.filename)
-
-    def save_html(self, content):
-        """Запазване на HTML съдържанието във файл."""
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
-        with open(self.file_path, 'w', encoding='utf-8') as file:
-            file.write(content)
-
-    def get_html(self):
-        """Извличане на HTML съдържание от страницата."""
-        headers = {"User-Agent": "Mozilla/5.0"}
-        if os.path.exists(self.file_path):
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                print("Зареждане на съдържание от локален файл.")
-                return f.read()
-        else:
-            try:
-                print(f"Изпращане на заявка до {self.base_url}")
-                response = requests.get(self.base_url, headers=headers)
-                response.raise_for_status()
-                self.save_html(response.text)
-                return response.text
-            except requests.exceptions.RequestException as e:
-                print(f"Грешка при заявката: {e}")
-                return None
-
-    def parse_products(self, html):
-        """Парсване на данни за продукти от страницата."""
-        soup = BeautifulSoup(html, 'html.parser')
-        product_containers = soup.find_all("a", class_="product-link")
-
-        for container in product_containers:
-            product_data = {}
-            product_data["brand"] = container.find("div", class_="brand").text.strip()
-            product_data["price"] = float(container.find("div", class_="regular-price").text.strip().replace("лв.", "").strip())
-            product_data["color"] = container.find("div", class_="color").text.strip() if container.find("div", class_="color") else "Unknown"
-            product_data["size"] = float(container.find("div", class_="size").text.strip()) if container.find("div", class_="size") else 0.0
-            self.products.append(product_data)
-
-    def run(self):
-        """Изпълнение на скрейпера за извличане и парсване на данни за продукти."""
-        html = self.get_html()
-        if html:
-            self.parse_products(html)
-
-# PyQt6 GUI за показване и взаимодействие с данни
-class DataTable(qtw.QTableWidget):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.db = DB()  
-        if not self.db.conn:
-            qtw.QMessageBox.critical(None, "Грешка с базата данни", "Неуспешно свързване с базата данни.")
-            return
-        self.column_names = ["Марка", "Цена", "Цвят"]
-        self.setup_table()
-
-    def setup_table(self):
-        """Конфигурация на таблицата с данни."""
-        self.setColumnCount(len(self.column_names))
-        self.setHorizontalHeaderLabels(self.column_names)
-        self.resizeColumnsToContents()
-        self.setSortingEnabled(True)
-        self.update_table(self.db.select_all_data())
-
-    def update_table(self, data):
-        """Актуализиране на таблицата с нови данни."""
-        self.setRowCount(0)
-        for row_num, row_data in enumerate(data):
-            self.insertRow(row_num)
-            for col_num, value in enumerate(row_data):
-                self.setItem(row_num, col_num, qtw.QTableWidgetItem(str(value)))
-
-    def filter_by_size(self, size):
-        """Филтриране на данни по размер."""
-        try:
-            size = float(size)
-            data = self.db.select_data_by_size(size)
-            self.update_table(data)
-        except ValueError:
-            qtw.QMessageBox.warning(None, "Невалиден вход", "Моля, въведете валиден размер.")
-
-    def filter_by_price(self, max_price):
-        """Филтриране на данни по максимална цена."""
-        try:
-            max_price = float(max_price)
-            data = [product for product in self.db.select_all_data() if product[1] <= max_price]
-            self.update_table(data)
-        except ValueError:
-            qtw.QMessageBox.warning(None, "Невалиден вход", "Моля, въведете валидна цена.")
-
-# Главен прозорец на приложението
-class MainWindow(qtw.QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Pepina Scraper")
-        self.setup_gui()
-
-    def setup_gui(self):
-        layout = qtw.QVBoxLayout()
-        self.tableView = DataTable()
-        layout.addWidget(self.tableView)
-        mainWidget = qtw.QWidget()
-        mainWidget.setLayout(layout)
-        self.setCentralWidget(mainWidget)
-
-if __name__ == '__main__':
-    app = qtw.QApplication([])
-    window = MainWindow()
-    window.show()
-    app.exec()
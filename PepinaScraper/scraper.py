@@ -1,13 +1,17 @@
-import sqlite3
 import os
 import requests
 from bs4 import BeautifulSoup
+try:
+    from PepinaScraper.db import DB
+except ModuleNotFoundError:
+    # Стартиран като скрипт: python PepinaScraper/scraper.py
+    from db import DB
 
 
 #Scraper - събира информацията за продукти
 # инициализира създаването на обект ProductScraper 
-#Изтегля Html --> анализира продуктите (линкове, марка, цена, размер)
-#Записване в база данни SQL--> Създава таблица "products" -->записва данните по колони
+#Изтегля Html --> анализира продуктите (линкове, марка, цена, цвят, размер)
+#Записване в база данни SQL--> чрез класа DB от db.py, който управлява схемата
 #Отпечатва резултатите 
 
 
@@ -85,6 +89,10 @@ class ProductScraper:
             else:
                 product_data["price"] = None
 
+            # Извлича цвета на продукта
+            color_tag = container.find("div", class_="color")
+            product_data["color"] = color_tag.text.strip() if color_tag else "Unknown"
+
             # Извлича наличните размери
             size_container = container.find("div", class_="available-configurations")
             if size_container:
@@ -99,42 +107,9 @@ class ProductScraper:
             # Добавя продукта в списъка
             self.products.append(product_data)
 
-    def save_product_to_db(self, product_data):
-        """Запазва данни за продукта в база данни."""
-        conn = sqlite3.connect('products.db')  # Свързване към SQLite база данни
-        cursor = conn.cursor()
-
-        # Изтрива съществуващата таблица (ако има такава)
-        cursor.execute("DROP TABLE IF EXISTS products")
-
-        # Създава нова таблица за продуктите
-        cursor.execute('''CREATE TABLE IF NOT EXISTS products (
-                          id INTEGER PRIMARY KEY AUTOINCREMENT,
-                          title TEXT,
-                          brand TEXT,
-                          price REAL,
-                          sizes TEXT,
-                          link TEXT)''')
-
-        # Вмъква данните на продукта в таблицата
-        cursor.execute('''INSERT INTO products (title, brand, price, sizes, link)
-                          VALUES (?, ?, ?, ?, ?)''', 
-                       (product_data['title'], 
-                        product_data['brand'], 
-                        product_data['price'], 
-                        ', '.join(product_data['sizes']),  # Преобразува списъка в текст
-                        product_data['link']))
-
-        conn.commit()
-
-        # Извлича и принтира данните от базата за проверка
-        cursor.execute("SELECT * FROM products")
-        rows = cursor.fetchall()
-        print("Съдържание на базата след вмъкване:")
-        for row in rows:
-            print(row)
-
-        conn.close()
+    def save_products(self, db):
+        """Записва всички намерени продукти в базата данни с една транзакция."""
+        db.insert_rows(self.products)
 
     def run(self):
         """Стартира процеса на скрейпване."""
@@ -159,6 +134,7 @@ class ProductScraper:
             print(f"Заглавие: {product['title']}")
             print(f"Марка: {product['brand']}")
             print(f"Цена: {product['price']} лв.")
+            print(f"Цвят: {product['color']}")
             print(f"Размери: {', '.join(product['sizes']) if product['sizes'] else 'Няма налични размери'}")
             print(f"Линк: {product['link']}")
             print("-------------------------------")
@@ -170,3 +146,7 @@ if __name__ == "__main__":
     search_term = "обувки"
     scraper = ProductScraper(base_url, search_term)
     scraper.run()
+
+    db = DB()
+    scraper.save_products(db)
+    db.close()
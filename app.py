@@ -29,6 +29,7 @@ class DataTable(qtw.QTableWidget):
             return
 
         self.column_names = ["Brand", "Price", "Color"]
+        self.columns = ('brand', 'price', 'color')  # Колоните в базата, в реда на заглавията
         self.setup_table()
 
 
@@ -38,21 +39,23 @@ class DataTable(qtw.QTableWidget):
         self.setHorizontalHeaderLabels(self.column_names)
         self.resizeColumnsToContents()
         self.setSortingEnabled(True)
-        self.update_table(self.db.select_all_data())
+        self.update_table(self.db.select_products(self.columns))
 
     def update_table(self, data):
         """Обновяване на таблицата с нови данни."""
+        self.setSortingEnabled(False)  # Иначе редовете се пренареждат по време на попълването
         self.setRowCount(0)  # Изчистване на старите редове
         for row_num, row_data in enumerate(data):
             self.insertRow(row_num)
             for col_num, value in enumerate(row_data):
                 self.setItem(row_num, col_num, qtw.QTableWidgetItem(str(value)))
+        self.setSortingEnabled(True)
 
     def filter_by_size(self, size):
         """Филтриране на данните по размер."""
         try:
             size = float(size)
-            data = self.db.select_data_by_size(size)
+            data = self.db.select_products(self.columns, size=size)
             self.update_table(data)
         except ValueError:
             qtw.QMessageBox.warning(None, "Грешка", "Моля, въведете валиден номер.")
@@ -61,7 +64,7 @@ class DataTable(qtw.QTableWidget):
         """Филтриране на данните по максимална цена."""
         try:
             max_price = float(max_price)
-            data = [product for product in self.db.select_all_data() if product[1] <= max_price]
+            data = self.db.select_products(self.columns, max_price=max_price)
             self.update_table(data)
         except ValueError:
             qtw.QMessageBox.warning(None, "Грешка", "Моля, въведете валидна цена.")
@@ -150,6 +153,10 @@ class MainWindow(qtw.QMainWindow):
         try:
             scraper = ProductScraper(BASE_URL, "обувки")
             scraper.run()
+
+            db = DB()
+            scraper.save_products(db)
+            db.close()
         except Exception as e:
             qtw.QMessageBox.critical(self, "Грешка", f"Скрейпингът не е извършен: {str(e)}")
 